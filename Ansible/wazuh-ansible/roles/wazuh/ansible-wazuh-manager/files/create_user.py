@@ -1,3 +1,4 @@
+import argparse
 import logging
 import sys
 import json
@@ -13,11 +14,12 @@ SPECIAL_CHARS = "@$!%*?&-_"
 
 
 try:
-    from wazuh.rbac.orm import check_database_integrity
+    from wazuh.rbac.orm import AuthenticationManager, check_database_integrity
     from wazuh.security import (
         create_user,
         get_users,
         get_roles,
+        remove_user_role,
         set_user_role,
         update_user,
     )
@@ -37,6 +39,14 @@ def db_users():
     return {user["username"]: user["id"] for user in users_result.affected_items}
 
 
+def db_users_roles():
+    users_result = get_users()
+    return {
+        user["username"]: (user["id"], set(user.get("roles", [])))
+        for user in users_result.affected_items
+    }
+
+
 def db_roles():
     roles_result = get_roles()
     return {role["name"]: role["id"] for role in roles_result.affected_items}
@@ -54,7 +64,7 @@ def disable_user(uid):
     # assure there must be at least one character from each group
     random_pass = random_pass + ''.join([random.choice(chars) for chars in [string.ascii_lowercase, string.digits, string.ascii_uppercase, SPECIAL_CHARS]])
     random_pass = ''.join(random.sample(random_pass,len(random_pass)))
-    update_user(
+    return update_user(
         user_id=[
             str(uid),
         ],
@@ -62,7 +72,138 @@ def disable_user(uid):
     )
 
 
+def read_bulk_file(path):
+    """Read desired users from a JSON file.
+
+    Either a list or {"users": [...]}, each entry with "username" and the
+    optional "password", "roles" (role names, the exact set to keep; new
+    users default to administrator) and "state" ("present" or "disabled").
+    A disabled user has no roles left and a random password.
+    """
+    with open(path) as bulk_file:
+        data = json.load(bulk_file)
+    users = data["users"] if isinstance(data, dict) else data
+    for user in users:
+        if "username" not in user:
+            raise ValueError(f"user entry without a username: {sorted(user)}")
+        user.setdefault("state", "present")
+        if user["state"] not in ("present", "disabled"):
+            raise ValueError(f"invalid state '{user['state']}' for user {user['username']}")
+    return users
+
+
+def plan_bulk(desired, users, roles):
+    """Diff desired users against the RBAC database (one fetch of each)"""
+    plan = {"create": [], "update": [], "add_roles": {}, "remove_roles": {}, "disable": []}
+    with AuthenticationManager() as auth:
+        for user in desired:
+            plan_user(plan, user, users, roles, auth)
+    return plan
+
+
+def plan_user(plan, user, users, roles, auth):
+    username = user["username"]
+    if user["state"] == "disabled":
+        if username in users and users[username][1]:
+            plan["disable"].append(username)
+            plan["remove_roles"][username] = sorted(users[username][1])
+        return
+
+    if username not in users:
+        if not user.get("password"):
+            raise ValueError(f"user {username} does not exist and has no password")
+        plan["create"].append(username)
+        user.setdefault("roles", ["administrator"])
+        current = set()
+    else:
+        if user.get("password") and not auth.check_user(username, user["password"]):
+            plan["update"].append(username)
+        current = users[username][1]
+
+    if "roles" in user:
+        unknown = [name for name in user["roles"] if name not in roles]
+        if unknown:
+            raise ValueError(f"unknown roles {unknown} for user {username}")
+        wanted = {roles[name] for name in user["roles"]}
+        if wanted - current:
+            plan["add_roles"][username] = sorted(wanted - current)
+        if current - wanted:
+            plan["remove_roles"][username] = sorted(current - wanted)
+
+
+def check_result(result, action):
+    """Raise if the framework reported failed items for an action"""
+    if result.total_failed_items:
+        errors = "; ".join(
+            f"{error} ({', '.join(sorted(str(item) for item in items))})"
+            for error, items in result.failed_items.items()
+        )
+        raise RuntimeError(f"{action} failed: {errors}")
+
+
+def apply_bulk(plan, desired, users):
+    passwords = {user["username"]: user.get("password") for user in desired}
+
+    for username in plan["create"]:
+        check_result(create_user(username=username, password=passwords[username]), f"create {username}")
+    if plan["create"]:
+        # a single refetch picks up the ids of every created user
+        users = db_users_roles()
+
+    for username in plan["update"]:
+        check_result(
+            update_user(user_id=[str(users[username][0])], password=passwords[username]),
+            f"update {username}",
+        )
+    for username, role_ids in plan["add_roles"].items():
+        check_result(
+            set_user_role(user_id=[str(users[username][0])], role_ids=[str(rid) for rid in role_ids]),
+            f"add roles to {username}",
+        )
+    for username, role_ids in plan["remove_roles"].items():
+        check_result(
+            remove_user_role(user_id=[str(users[username][0])], role_ids=[str(rid) for rid in role_ids]),
+            f"remove roles from {username}",
+        )
+    for username in plan["disable"]:
+        check_result(disable_user(users[username][0]), f"disable {username}")
+
+
+def run_bulk(path, dry_run=False):
+    desired = read_bulk_file(path)
+    users = db_users_roles()
+    roles = db_roles()
+    plan = plan_bulk(desired, users, roles)
+    if not dry_run:
+        apply_bulk(plan, desired, users)
+
+    summary = {
+        "changed": any(plan.values()),
+        "dry_run": dry_run,
+        "create": plan["create"],
+        "update": plan["update"],
+        "add_roles": {name: len(ids) for name, ids in plan["add_roles"].items()},
+        "remove_roles": {name: len(ids) for name, ids in plan["remove_roles"].items()},
+        "disable": plan["disable"],
+    }
+    print(json.dumps(summary))
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create or update Wazuh API users")
+    parser.add_argument("--bulk", metavar="FILE", help="provision every user listed in a JSON file")
+    parser.add_argument("--dry-run", action="store_true", help="print the bulk changes without applying them")
+    args = parser.parse_args()
+
+    if args.bulk:
+        check_database_integrity()
+        try:
+            run_bulk(args.bulk, dry_run=args.dry_run)
+        except (RuntimeError, ValueError) as e:
+            logging.error(e)
+            sys.exit(1)
+        sys.exit(0)
+
     if not os.path.exists(USER_FILE_PATH):
         # abort if no user file detected
         sys.exit(0)
@@ -0,0 +1,180 @@
+"""Tests for the bulk mode of files/create_user.py against a stubbed
+wazuh framework (run with: python -m pytest -q tests)"""
+import importlib.util
+import json
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+SCRIPT = Path(__file__).resolve().parent.parent / "files" / "create_user.py"
+ROLES = {"administrator": 1, "readonly": 2}
+
+
+class Result:
+    def __init__(self, affected_items=(), failed_items=None):
+        self.affected_items = list(affected_items)
+        self.failed_items = failed_items or {}
+        self.total_failed_items = sum(len(items) for items in self.failed_items.values())
+
+
+class RBAC:
+    """In-memory RBAC database recording every framework call"""
+
+    def __init__(self, users):
+        self.users = users
+        self.calls = []
+
+    def get_users(self):
+        self.calls.append("get_users")
+        return Result(dict(user, roles=list(user["roles"])) for user in self.users.values())
+
+    def get_roles(self):
+        self.calls.append("get_roles")
+        return Result({"name": name, "id": rid} for name, rid in ROLES.items())
+
+    def create_user(self, username, password):
+        self.calls.append(f"create {username}")
+        if len(password) < 8:
+            return Result(failed_items={"Invalid password": {username}})
+        self.users[username] = {"username": username, "id": 100 + len(self.users), "roles": [], "password": password}
+        return Result([username])
+
+    def user(self, user_id):
+        return next(u for u in self.users.values() if str(u["id"]) == user_id[0])
+
+    def update_user(self, user_id, password):
+        self.calls.append(f"update {user_id[0]}")
+        self.user(user_id)["password"] = password
+        return Result(user_id)
+
+    def set_user_role(self, user_id, role_ids):
+        self.calls.append(f"set_roles {user_id[0]} {role_ids}")
+        self.user(user_id)["roles"] += [int(r) for r in role_ids]
+        return Result(user_id)
+
+    def remove_user_role(self, user_id, role_ids):
+        self.calls.append(f"remove_roles {user_id[0]} {role_ids}")
+        user = self.user(user_id)
+        user["roles"] = [r for r in user["roles"] if str(r) not in role_ids]
+        return Result(user_id)
+
+    def check_user(self, username, password):
+        return self.users.get(username, {}).get("password") == password
+
+
+@pytest.fixture
+def rbac(monkeypatch):
+    db = RBAC({
+        "wazuh": {"username": "wazuh", "id": 1, "roles": [1], "password": "Wazuh-Pass1"},
+        "old": {"username": "old", "id": 2, "roles": [1], "password": "Old-Pass1"},
+    })
+
+    class AuthenticationManager:
+        def __enter__(self):
+            return db
+
+        def __exit__(self, *exc):
+            return False
+
+    security = types.ModuleType("wazuh.security")
+    for name in ("get_users", "get_roles", "create_user", "update_user", "set_user_role", "remove_user_role"):
+        setattr(security, name, getattr(db, name))
+    orm = types.ModuleType("wazuh.rbac.orm")
+    orm.AuthenticationManager = AuthenticationManager
+    orm.check_database_integrity = lambda: None
+
+    monkeypatch.setitem(sys.modules, "wazuh", types.ModuleType("wazuh"))
+    monkeypatch.setitem(sys.modules, "wazuh.rbac", types.ModuleType("wazuh.rbac"))
+    monkeypatch.setitem(sys.modules, "wazuh.rbac.orm", orm)
+    monkeypatch.setitem(sys.modules, "wazuh.security", security)
+    return db
+
+
+@pytest.fixture
+def create_user(rbac):
+    spec = importlib.util.spec_from_file_location("create_user", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def bulk_file(tmp_path, users):
+    path = tmp_path / "api_users.json"
+    path.write_text(json.dumps(users))
+    return str(path)
+
+
+USERS = [
+    {"username": "analyst1", "password": "Analyst-Pass1"},
+    {"username": "analyst2", "password": "Analyst-Pass2", "roles": ["readonly"]},
+    {"username": "wazuh", "password": "Wazuh-Pass1", "roles": ["readonly"]},
+    {"username": "old", "state": "disabled"},
+]
+
+
+def summary(capsys):
+    return json.loads(capsys.readouterr().out.strip().splitlines()[-1])
+
+
+def test_bulk_applies_diff_with_one_fetch(create_user, rbac, tmp_path, capsys):
+    create_user.run_bulk(bulk_file(tmp_path, USERS))
+    result = summary(capsys)
+
+    assert result["changed"] is True
+    assert result["create"] == ["analyst1", "analyst2"]
+    assert result["update"] == []
+    assert result["disable"] == ["old"]
+    assert rbac.users["analyst1"]["roles"] == [1]
+    assert rbac.users["analyst2"]["roles"] == [2]
+    assert rbac.users["wazuh"]["roles"] == [2]
+    assert rbac.users["old"]["roles"] == []
+    assert rbac.users["old"]["password"] != "Old-Pass1"
+    # initial users + roles, and one refetch after the creates
+    assert rbac.calls.count("get_users") == 2
+    assert rbac.calls.count("get_roles") == 1
+
+
+def test_bulk_is_idempotent(create_user, rbac, tmp_path, capsys):
+    path = bulk_file(tmp_path, USERS)
+    create_user.run_bulk(path)
+    capsys.readouterr()
+    rbac.calls.clear()
+
+    create_user.run_bulk(path)
+    result = summary(capsys)
+    assert result["changed"] is False
+    assert rbac.calls == ["get_users", "get_roles"]
+
+
+def test_dry_run_changes_nothing(create_user, rbac, tmp_path, capsys):
+    create_user.run_bulk(bulk_file(tmp_path, USERS), dry_run=True)
+    result = summary(capsys)
+    assert result["dry_run"] is True
+    assert result["create"] == ["analyst1", "analyst2"]
+    assert "analyst1" not in rbac.users
+    assert rbac.calls == ["get_users", "get_roles"]
+
+
+def test_password_update_only_when_different(create_user, rbac, tmp_path, capsys):
+    create_user.run_bulk(bulk_file(tmp_path, [{"username": "wazuh", "password": "New-Wazuh-Pass1"}]))
+    assert summary(capsys)["update"] == ["wazuh"]
+    assert rbac.users["wazuh"]["password"] == "New-Wazuh-Pass1"
+
+
+def test_failed_create_raises(create_user, rbac, tmp_path):
+    with pytest.raises(RuntimeError, match="create weak failed: Invalid password"):
+        create_user.run_bulk(bulk_file(tmp_path, [{"username": "weak", "password": "short"}]))
+    assert "weak" not in rbac.users
+
+
+@pytest.mark.parametrize("users", [
+    [{"username": "ghost", "roles": ["readonly"]}],
+    [{"username": "wazuh", "roles": ["nonexistent"]}],
+    [{"username": "wazuh", "state": "absent"}],
+    [{"password": "Secret.123", "roles": ["readonly"]}],
+])
+def test_invalid_entries_are_rejected(create_user, tmp_path, users):
+    with pytest.raises(ValueError):
+        create_user.run_bulk(bulk_file(tmp_path, users))
@@ -12,6 +12,12 @@ import uuid
 from datetime import datetime
 import json
 import time
+import re
+import shlex
+import codecs
+import difflib
+import hashlib
+import tempfile
 
 app = FastAPI(title="Ansible Dashboard v2")
 
@@ -36,6 +42,11 @@ if Path("/app/Ansible").exists():
 else:
     ANSIBLE_BASE = Path(__file__).parent.parent.parent / "Ansible"
 
+if Path("/app/Terraform").exists():
+    TERRAFORM_BASE = Path("/app/Terraform")
+else:
+    TERRAFORM_BASE = Path(__file__).parent.parent.parent / "Terraform"
+
 # Load history on startup
 def load_history():
     global history_store
@@ -57,6 +68,167 @@ def save_history():
 
 load_history()
 
+def atomic_write_text(path: Path, text: str):
+    """Write via a temp file in the same directory and rename it over path,
+    so readers never see a half-written file"""
+    fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        if path.exists():
+            mode = path.stat().st_mode & 0o777
+        else:
+            # mkstemp creates 0600, a new file gets what write_text would give it
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+# SSH connection pool: ControlMaster sockets owned by the backend and shared
+# by every ansible-playbook run, so handshakes are reused across jobs.
+SSH_CONTROL_DIR = Path(os.environ.get("SSH_CONTROL_DIR", "/tmp/ansible_dashboard_ssh"))
+SSH_CONTROL_PERSIST = int(os.environ.get("SSH_CONTROL_PERSIST", "600"))  # idle seconds before a master exits
+SSH_CONTROL_PATH = "%r@%h:%p"
+# sun_path holds 108 bytes with the NUL; ssh binds the master to the
+# socket path plus a 17-char ".XXXXXXXXXXXXXXXX" suffix before renaming it
+SSH_SOCKET_PATH_MAX = 108 - 1 - 17
+ssh_pool_stats = {"hits": 0, "misses": 0, "prewarmed": 0, "prewarm_failed": 0, "prewarm_unsupported": 0}
+
+# Run result cache: successful runs keyed by a fingerprint of everything
+# that feeds the run, so identical re-runs can be skipped or check-only
+RUN_CACHE_FILE = Path("/tmp/ansible_dashboard_run_cache.json")
+RUN_CACHE_TTL = int(os.environ.get("RUN_CACHE_TTL", "3600"))
+RUN_CACHE_OUTPUT = 20000  # Keep last 20000 chars of output per cached run
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;]*m")
+run_cache: Dict[str, Dict[str, Any]] = {}
+file_digest_cache: Dict[str, tuple] = {}
+
+def load_run_cache():
+    global run_cache
+    if RUN_CACHE_FILE.exists():
+        try:
+            with open(RUN_CACHE_FILE, 'r') as f:
+                run_cache = json.load(f)
+        except:
+            run_cache = {}
+
+def save_run_cache():
+    now = time.time()
+    for fingerprint in [k for k, v in run_cache.items() if now - v["cached_at"] > RUN_CACHE_TTL]:
+        del run_cache[fingerprint]
+    try:
+        with open(RUN_CACHE_FILE, 'w') as f:
+            json.dump(run_cache, f)
+    except:
+        pass
+
+load_run_cache()
+
+# Terraform: providers are shared through one plugin cache directory and
+# binary plans are stored by a hash of the module config and its vars
+TF_PLUGIN_CACHE_DIR = Path(os.environ.get("TF_PLUGIN_CACHE_DIR", "/tmp/ansible_dashboard_tf_plugins"))
+TF_PLAN_DIR = Path("/tmp/ansible_dashboard_tf_plans")
+TF_PARALLELISM = int(os.environ.get("TF_PARALLELISM", "4"))  # modules planned at once
+tf_init_lock = asyncio.Lock()  # terraform init is not safe to run concurrently on a shared plugin cache
+
+# Duration model: recent durations and task counts per folder/playbook/
+# inventory size, used for ETAs and by the job dispatcher
+DURATION_MODEL_FILE = Path("/tmp/ansible_dashboard_durations.json")
+DURATION_WINDOW = 50  # samples kept per key
+TASK_LINE = re.compile(r"^(TASK|RUNNING HANDLER) \[", re.MULTILINE)
+duration_model: Dict[str, Dict[str, List[float]]] = {}
+
+# Job dispatcher: at most MAX_CONCURRENT_JOBS run at once, queued jobs are
+# started shortest expected job first ("sejf") or in arrival order ("fifo")
+MAX_CONCURRENT_JOBS = int(os.environ.get("MAX_CONCURRENT_JOBS", "4"))
+JOB_SCHEDULING = os.environ.get("JOB_SCHEDULING", "sejf")
+JOB_MAX_WAIT = int(os.environ.get("JOB_MAX_WAIT", "900"))  # seconds before a queued job jumps ahead
+pending_jobs: List[Dict[str, Any]] = []
+running_jobs = 0
+dispatch_seq = 0
+
+def size_bucket(hosts: int) -> int:
+    """Round an inventory size up to a power of two"""
+    return 1 << max(hosts - 1, 0).bit_length()
+
+def duration_keys(folder: str, playbook: str, hosts: int) -> List[str]:
+    """Model keys from the most to the least specific; a run never borrows
+    the history of another folder or playbook"""
+    return [f"{folder}|{playbook}|{size_bucket(hosts)}", f"{folder}|{playbook}"]
+
+def record_duration(folder: str, playbook: str, hosts: int, duration: float, tasks: int):
+    for key in duration_keys(folder, playbook, hosts):
+        samples = duration_model.setdefault(key, {"durations": [], "tasks": []})
+        samples["durations"] = (samples["durations"] + [duration])[-DURATION_WINDOW:]
+        if tasks:
+            samples["tasks"] = (samples["tasks"] + [tasks])[-DURATION_WINDOW:]
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+def neutral_duration() -> float:
+    """Median p50 over every folder/playbook with history, used for
+    scheduling jobs that have none; 0 when nothing has run yet"""
+    p50s = [
+        percentile(samples["durations"], 0.5)
+        for key, samples in duration_model.items()
+        if key.count("|") == 1 and samples["durations"]
+    ]
+    return percentile(p50s, 0.5) if p50s else 0.0
+
+def expected_seconds(job: Dict[str, Any]) -> float:
+    """Scheduling estimate of a job: its own p50, else the neutral duration"""
+    estimate = estimate_duration(job["folder"], job["playbook"], job.get("hosts", 0))
+    return estimate["p50"] if estimate else neutral_duration()
+
+def estimate_duration(folder: str, playbook: str, hosts: int) -> Optional[Dict[str, Any]]:
+    """Expected duration (p50/p90) and task count of a run, None without history"""
+    for key in duration_keys(folder, playbook, hosts):
+        samples = duration_model.get(key)
+        if samples and samples["durations"]:
+            return {
+                "p50": round(percentile(samples["durations"], 0.5), 2),
+                "p90": round(percentile(samples["durations"], 0.9), 2),
+                "tasks": round(percentile(samples["tasks"], 0.5)) if samples["tasks"] else None,
+                "samples": len(samples["durations"]),
+                "basis": key
+            }
+    return None
+
+def load_duration_model():
+    global duration_model
+    if DURATION_MODEL_FILE.exists():
+        try:
+            with open(DURATION_MODEL_FILE, 'r') as f:
+                duration_model = json.load(f)
+            return
+        except:
+            pass
+    # first start: seed the model from execution history
+    duration_model = {}
+    for h in history_store:
+        if h.get("status") == "completed" and h.get("duration"):
+            record_duration(h["folder"], h["playbook"], h.get("hosts", 0), h["duration"], h.get("tasks", 0))
+
+def save_duration_model():
+    try:
+        with open(DURATION_MODEL_FILE, 'w') as f:
+            json.dump(duration_model, f)
+    except:
+        pass
+
+load_duration_model()
+
 class InventoryEntry(BaseModel):
     name: str
     host: str
@@ -76,6 +248,7 @@ class PlaybookRequest(BaseModel):
     playbook: str
     inventory: str
     vars: Dict[str, Any]
+    cache: str = "off"  # off, reuse (return cached result) or check (--check first, run on drift)
 
 class JobStatus(BaseModel):
     job_id: str
@@ -87,6 +260,48 @@ class JobStatus(BaseModel):
     duration: Optional[float] = None
     folder: str
     playbook: str
+    ssh_pool: Optional[Dict[str, int]] = None
+    cache: Optional[str] = None
+    cached_job_id: Optional[str] = None
+    modules: Optional[Dict[str, Dict[str, Any]]] = None
+    hosts: Optional[int] = None
+    expected_duration: Optional[float] = None
+    estimate_basis: Optional[str] = None
+    eta_seconds: Optional[float] = None
+    percent_complete: Optional[float] = None
+    queue_position: Optional[int] = None
+
+class TerraformModule(BaseModel):
+    name: str
+    path: str
+    has_tfvars: bool
+    tf_files: List[str]
+
+class TerraformPlanRequest(BaseModel):
+    modules: List[str]
+    vars: Dict[str, Dict[str, Any]] = {}  # extra variables per module
+
+class TerraformApplyRequest(BaseModel):
+    module: str
+    vars: Dict[str, Any] = {}
+
+class BatchEdit(BaseModel):
+    folder: str
+    op: str  # add_host, remove_host, rename_host, set_host_var, set_var, unset_var
+    group: Optional[str] = None
+    name: Optional[str] = None
+    new_name: Optional[str] = None
+    key: Optional[str] = None
+    value: Any = None
+    host_vars: Dict[str, Any] = {}
+
+class BatchEditRequest(BaseModel):
+    edits: List[BatchEdit]
+    dry_run: bool = False
+
+class PrewarmRequest(BaseModel):
+    folder: str
+    inventory: str = "inventory.ini"
 
 @app.get("/")
 async def root():
@@ -192,7 +407,7 @@ async def update_inventory(folder_name: str, content: Dict[str, Any]):
     inventory_file = folder_path / "inventory.ini"
 
     if "raw" in content:
-        inventory_file.write_text(content["raw"])
+        atomic_write_text(inventory_file, content["raw"])
     else:
         lines = []
         for group, hosts in content.items():
@@ -205,7 +420,7 @@ async def update_inventory(folder_name: str, content: Dict[str, Any]):
                 lines.append(host_line)
             lines.append("")
 
-        inventory_file.write_text("\n".join(lines))
+        atomic_write_text(inventory_file, "\n".join(lines))
 
     return {"success": True}
 
@@ -216,46 +431,578 @@ async def update_vars(folder_name: str, content: Dict[str, Any]):
     vars_file = folder_path / "vars.yml"
 
     if "raw" in content:
-        vars_file.write_text(content["raw"])
+        atomic_write_text(vars_file, content["raw"])
     else:
-        with open(vars_file, 'w') as f:
-            yaml.dump(content, f, default_flow_style=False)
+        atomic_write_text(vars_file, yaml.dump(content, default_flow_style=False))
 
     return {"success": True}
 
-async def run_ansible_playbook(job_id: str, folder: str, playbook: str, inventory: str):
-    """Run ansible playbook in background with detailed output"""
+def parse_inventory_hosts(inventory_file: Path) -> List[Dict[str, Any]]:
+    """Return the unique SSH targets of an INI inventory: host, user, port
+    and the per-host ssh options a connection needs"""
+    hosts: Dict[str, Dict[str, str]] = {}
+    groups: Dict[str, List[str]] = {}
+    group_vars: Dict[str, Dict[str, str]] = {}
+    section = "ungrouped"
+    local_user = os.environ.get("USER", "root")
+
+    for line in inventory_file.read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith(("#", ";")):
+            continue
+        if line.startswith("[") and line.endswith("]"):
+            section = line[1:-1].strip()
+            continue
+        if section.endswith(":children"):
+            continue
+        try:
+            # values may be quoted, e.g. ansible_ssh_common_args='-o ProxyJump=bastion'
+            parts = shlex.split(line, comments=True)
+        except ValueError:
+            continue
+        if not parts:
+            continue
+        if section.endswith(":vars"):
+            k, sep, v = " ".join(parts).partition("=")
+            if sep:
+                group_vars.setdefault(section[:-len(":vars")], {})[k.strip()] = v.strip()
+            continue
+
+        host_vars = hosts.setdefault(parts[0], {})
+        for part in parts[1:]:
+            if "=" in part:
+                k, v = part.split("=", 1)
+                host_vars[k] = v
+        groups.setdefault(section, []).append(parts[0])
+
+    targets = {}
+    for name, host_vars in hosts.items():
+        merged = dict(group_vars.get("all", {}))
+        for group, members in groups.items():
+            if name in members:
+                merged.update(group_vars.get(group, {}))
+        merged.update(host_vars)
+        if merged.get("ansible_connection", "ssh") != "ssh":
+            continue
+        target = {
+            "name": name,
+            "host": merged.get("ansible_host", merged.get("ansible_ssh_host", name)),
+            "user": merged.get("ansible_user", merged.get("ansible_ssh_user", local_user)),
+            "port": str(merged.get("ansible_port", merged.get("ansible_ssh_port", 22))),
+            "identity_file": merged.get("ansible_ssh_private_key_file"),
+            "ssh_args": " ".join(
+                merged[k] for k in ("ansible_ssh_common_args", "ansible_ssh_extra_args") if merged.get(k)
+            ),
+            # only whether a password is set, the value must not reach API responses
+            "password_auth": bool(merged.get("ansible_password") or merged.get("ansible_ssh_pass")),
+        }
+        targets[(target["host"], target["user"], target["port"])] = target
+
+    return list(targets.values())
+
+def ssh_control_socket(target: Dict[str, Any]) -> Path:
+    """Socket path ssh derives from SSH_CONTROL_PATH for this target"""
+    return SSH_CONTROL_DIR / f"{target['user']}@{target['host']}:{target['port']}"
+
+def configured_ssh_args(folder_path: Path, env: Dict[str, str]) -> str:
+    """ssh_args ansible would use for a run in folder_path: the environment,
+    else [ssh_connection] ssh_args of the first ansible.cfg found, else
+    ansible's default"""
+    if env.get("ANSIBLE_SSH_ARGS"):
+        return env["ANSIBLE_SSH_ARGS"]
+
+    candidates = [env.get("ANSIBLE_CONFIG"), folder_path / "ansible.cfg",
+                  Path.home() / ".ansible.cfg", "/etc/ansible/ansible.cfg"]
+    for candidate in candidates:
+        if candidate and Path(candidate).is_file():
+            config = configparser.ConfigParser(interpolation=None)
+            try:
+                config.read(candidate)
+            except configparser.Error:
+                break
+            if config.has_option("ssh_connection", "ssh_args"):
+                return config.get("ssh_connection", "ssh_args")
+            break
+
+    return "-C -o ControlMaster=auto -o ControlPersist=60s"
+
+def pool_ssh_args(ssh_args: str) -> str:
+    """ssh_args with the pool's ControlMaster/ControlPersist. ssh keeps the
+    first value of an option, so existing Control options are dropped"""
+    ssh_args = re.sub(r"-o\s*['\"]?Control(Master|Persist)[=\s]\S+", "", ssh_args)
+    return " ".join(ssh_args.split() + ["-o", "ControlMaster=auto", "-o", f"ControlPersist={SSH_CONTROL_PERSIST}s"])
+
+def ssh_pool_env(env: Dict[str, str], folder_path: Path) -> Dict[str, str]:
+    """Point ansible's ssh connection plugin at the shared ControlMaster
+    sockets, keeping any configured ssh_args (ProxyJump, key options)"""
+    SSH_CONTROL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    env["ANSIBLE_SSH_ARGS"] = pool_ssh_args(configured_ssh_args(folder_path, env))
+    env["ANSIBLE_SSH_CONTROL_PATH_DIR"] = str(SSH_CONTROL_DIR)
+    env["ANSIBLE_SSH_CONTROL_PATH"] = "%(directory)s/" + SSH_CONTROL_PATH.replace("%", "%%")
+    return env
+
+async def ssh_control(command: str, socket: Path, timeout: float = 5) -> bool:
+    """Send a control command (check/exit) to a master, True on success"""
+    try:
+        process = await asyncio.create_subprocess_exec(
+            "ssh", "-O", command, "-o", f"ControlPath={socket}", "pool",
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.DEVNULL
+        )
+        return await asyncio.wait_for(process.wait(), timeout) == 0
+    except (OSError, asyncio.TimeoutError):
+        return False
+
+async def ssh_master_alive(target: Dict[str, Any]) -> bool:
+    socket = ssh_control_socket(target)
+    return socket.exists() and await ssh_control("check", socket)
+
+async def prewarm_ssh_master(target: Dict[str, Any], folder_path: Path, timeout: float = 15) -> Dict[str, Any]:
+    """Open a background master connection for target unless one is alive"""
+    result = {**target, "status": "alive"}
+    if await ssh_master_alive(target):
+        return result
+    if target["password_auth"]:
+        # ansible feeds the password through sshpass; prewarm runs in BatchMode
+        result.update(status="unsupported", error="password authentication")
+        ssh_pool_stats["prewarm_unsupported"] += 1
+        return result
+    socket_length = len(str(ssh_control_socket(target)).encode())
+    if socket_length > SSH_SOCKET_PATH_MAX:
+        result.update(status="failed", error=(
+            f"control socket path is {socket_length} bytes, over the {SSH_SOCKET_PATH_MAX} byte limit; "
+            "use a shorter SSH_CONTROL_DIR"
+        ))
+        ssh_pool_stats["prewarm_failed"] += 1
+        return result
+
+    options = shlex.split(pool_ssh_args(configured_ssh_args(folder_path, os.environ)))
+    options += shlex.split(target["ssh_args"])
+    if target["identity_file"]:
+        options += ["-i", target["identity_file"]]
+
+    SSH_CONTROL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+    # ssh -f keeps stderr open in the detached master, so read it from a file
+    # instead of a pipe that would only reach EOF when the master exits
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "ssh", "-fN",
+                "-o", "BatchMode=yes",
+                "-o", "ConnectTimeout=10",
+                "-o", "ControlMaster=yes",
+                "-o", f"ControlPersist={SSH_CONTROL_PERSIST}s",
+                "-o", f"ControlPath={SSH_CONTROL_DIR}/{SSH_CONTROL_PATH}",
+                *options,
+                "-p", target["port"],
+                "-l", target["user"],
+                target["host"],
+                cwd=str(folder_path),
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=stderr
+            )
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            result.update(status="failed", error="timed out")
+        except OSError as e:
+            result.update(status="failed", error=str(e))
+        else:
+            if process.returncode == 0:
+                result["status"] = "opened"
+            else:
+                stderr.seek(0)
+                result.update(status="failed", error=stderr.read().decode().strip())
+
+    ssh_pool_stats["prewarmed" if result["status"] == "opened" else "prewarm_failed"] += 1
+    return result
+
+async def ssh_pool_lookup(inventory_file: Path) -> Dict[str, int]:
+    """Count inventory hosts that already have a live master (pool hits)"""
+    try:
+        targets = parse_inventory_hosts(inventory_file)
+    except OSError:
+        return {"hits": 0, "misses": 0}
+    alive = await asyncio.gather(*(ssh_master_alive(t) for t in targets))
+    hits = sum(alive)
+    ssh_pool_stats["hits"] += hits
+    ssh_pool_stats["misses"] += len(targets) - hits
+    return {"hits": hits, "misses": len(targets) - hits}
+
+INVENTORY_OPS = ("add_host", "remove_host", "rename_host", "set_host_var")
+VARS_OPS = ("set_var", "unset_var")
+
+def inventory_sections(lines: List[str]) -> List[Optional[str]]:
+    """Section of each inventory line, None for headers, :vars and :children"""
+    sections = []
+    section = "ungrouped"
+    for line in lines:
+        stripped = line.strip()
+        if stripped.startswith("[") and stripped.endswith("]"):
+            section = stripped[1:-1].strip()
+            sections.append(None)
+        elif ":" in section:
+            sections.append(None)
+        else:
+            sections.append(section)
+    return sections
+
+def split_host_line(line: str):
+    """Split an inventory host line into (tokens, trailing comment). Quoted
+    values such as k='-o ProxyJump=b' stay one token, quotes included, and a
+    '#' inside quotes is not a comment"""
+    tokens = []
+    token = ""
+    quote = None
+    for i, char in enumerate(line):
+        if quote:
+            token += char
+            if char == quote:
+                quote = None
+        elif char in "'\"":
+            token += char
+            quote = char
+        elif char == "#":
+            if token:
+                tokens.append(token)
+            return tokens, line[i:]
+        elif char.isspace():
+            if token:
+                tokens.append(token)
+            token = ""
+        else:
+            token += char
+    if quote:
+        raise ValueError(f"unbalanced quote in inventory line: {line.strip()}")
+    if token:
+        tokens.append(token)
+    return tokens, ""
+
+def host_line_name(line: str) -> List[str]:
+    """First token of a host line, as a list; [] for lines that cannot be parsed"""
+    try:
+        return split_host_line(line)[0][:1]
+    except ValueError:
+        return []
+
+def join_host_line(tokens: List[str], comment: str) -> str:
+    return " ".join(tokens) + (f" {comment}" if comment else "")
+
+def host_var_token(key: str, value: Any) -> str:
+    """key=value token for a host line, rejecting values the line format
+    cannot hold unquoted"""
+    token = f"{key}={value}"
+    if re.search(r"[\s#;'\"]", token):
+        raise ValueError(f"{key}: whitespace, quotes, '#' and ';' are not supported in host vars, set it in group_vars instead")
+    return token
+
+def edit_inventory_text(text: str, edit: BatchEdit) -> str:
+    """Apply one host edit to INI inventory text, leaving other lines untouched"""
+    lines = text.splitlines()
+    sections = inventory_sections(lines)
+    if not edit.name:
+        raise ValueError(f"{edit.op} needs name")
+    # group narrows remove_host and set_host_var; a rename applies inventory-wide
+    scoped = edit.group is not None and edit.op in ("remove_host", "set_host_var")
+    matches = [
+        i for i, line in enumerate(lines)
+        if sections[i] and host_line_name(line) == [edit.name]
+        and (not scoped or sections[i] == edit.group)
+    ]
+
+    if edit.op == "add_host":
+        if not edit.group:
+            raise ValueError("add_host needs group")
+        host_line = " ".join([host_var_token(k, v) for k, v in edit.host_vars.items()])
+        host_line = f"{edit.name} {host_line}".strip()
+        headers = {
+            line.strip()[1:-1].strip(): i for i, line in enumerate(lines)
+            if line.strip().startswith("[") and line.strip().endswith("]")
+        }
+        in_group = [i for i in matches if sections[i] == edit.group]
+        if in_group:
+            lines[in_group[0]] = host_line
+        elif edit.group in headers:
+            members = [i for i, section in enumerate(sections) if section == edit.group and lines[i].strip()]
+            lines.insert((max(members) if members else headers[edit.group]) + 1, host_line)
+        else:
+            if lines and lines[-1].strip():
+                lines.append("")
+            lines += [f"[{edit.group}]", host_line]
+        return "\n".join(lines) + "\n"
+
+    if not matches:
+        raise ValueError(f"host {edit.name} not found")
+
+    if edit.op == "remove_host":
+        lines = [line for i, line in enumerate(lines) if i not in matches]
+    elif edit.op == "rename_host":
+        if not edit.new_name:
+            raise ValueError("rename_host needs new_name")
+        if any(sections[i] and host_line_name(line) == [edit.new_name] for i, line in enumerate(lines)):
+            raise ValueError(f"host {edit.new_name} already exists")
+        for i in matches:
+            tokens, comment = split_host_line(lines[i])
+            lines[i] = join_host_line([edit.new_name] + tokens[1:], comment)
+    elif edit.op == "set_host_var":
+        if not edit.key:
+            raise ValueError("set_host_var needs key")
+        for i in matches:
+            tokens, comment = split_host_line(lines[i])
+            new_token = [] if edit.value is None else [host_var_token(edit.key, edit.value)]
+            existing = [j for j, t in enumerate(tokens) if t.startswith(f"{edit.key}=")]
+            if existing:
+                tokens[existing[0]:existing[0] + 1] = new_token
+            else:
+                tokens += new_token
+            lines[i] = join_host_line(tokens, comment)
+
+    return "\n".join(lines) + "\n"
+
+def edit_vars_text(text: str, edit: BatchEdit) -> str:
+    """Set or unset one top-level key in YAML text, keeping comments and
+    the layout of every other key"""
+    if not edit.key:
+        raise ValueError(f"{edit.op} needs key")
+    lines = text.splitlines()
+
+    start = next((i for i, line in enumerate(lines) if re.match(rf"^{re.escape(edit.key)}\s*:", line)), None)
+    end = start
+    if start is not None:
+        end = start + 1
+        # the block runs until the next line that starts at column 0
+        while end < len(lines) and (not lines[end].strip() or lines[end][0] in " \t" or lines[end].startswith("- ")):
+            end += 1
+        # keep blank lines that separate it from the next key
+        while end > start + 1 and not lines[end - 1].strip():
+            end -= 1
+
+    if edit.op == "set_var":
+        block = yaml.dump({edit.key: edit.value}, default_flow_style=False, sort_keys=False).rstrip("\n").splitlines()
+        if start is None:
+            lines += block
+        else:
+            lines[start:end] = block
+    elif start is None:
+        raise ValueError(f"var {edit.key} not found")
+    else:
+        del lines[start:end]
+
+    new_text = "\n".join(lines) + "\n"
+    data = yaml.safe_load(new_text)
+    if data is not None and not isinstance(data, dict):
+        raise ValueError("vars file is not a mapping")
+    return new_text
+
+def batch_edit_target(folder: str, op: str) -> Path:
+    folder_path = (ANSIBLE_BASE / folder).resolve()
+    if ANSIBLE_BASE.resolve() not in folder_path.parents or not folder_path.is_dir():
+        raise HTTPException(status_code=404, detail=f"Folder not found: {folder}")
+
+    if op in INVENTORY_OPS:
+        target = folder_path / "inventory.ini"
+        if not target.exists() and (folder_path / "hosts").exists():
+            target = folder_path / "hosts"
+    elif op in VARS_OPS:
+        target = folder_path / "vars.yml"
+        if not target.exists() and (folder_path / "variables.yml").exists():
+            target = folder_path / "variables.yml"
+    else:
+        raise HTTPException(status_code=400, detail=f"Unknown op: {op}")
+    return target
+
+@app.post("/api/batch-edit")
+async def batch_edit(request: BatchEditRequest):
+    """Apply inventory and vars edits across many folders, all or nothing"""
+    originals: Dict[Path, str] = {}
+    updated: Dict[Path, str] = {}
+
+    for index, edit in enumerate(request.edits):
+        target = batch_edit_target(edit.folder, edit.op)
+        if target not in originals:
+            originals[target] = target.read_text() if target.exists() else ""
+            updated[target] = originals[target]
+        try:
+            if edit.op in INVENTORY_OPS:
+                updated[target] = edit_inventory_text(updated[target], edit)
+            else:
+                updated[target] = edit_vars_text(updated[target], edit)
+        except (ValueError, yaml.YAMLError) as e:
+            raise HTTPException(status_code=400, detail=f"Edit {index} ({edit.folder} {edit.op}): {e}")
+
+    files = []
+    for target, text in updated.items():
+        files.append({
+            "folder": str(target.parent.relative_to(ANSIBLE_BASE.resolve())),
+            "file": target.name,
+            "changed": text != originals[target],
+            "diff": "".join(difflib.unified_diff(
+                originals[target].splitlines(keepends=True),
+                text.splitlines(keepends=True),
+                fromfile=f"a/{target.relative_to(ANSIBLE_BASE.resolve())}",
+                tofile=f"b/{target.relative_to(ANSIBLE_BASE.resolve())}"
+            ))
+        })
+
+    if not request.dry_run:
+        written = []
+        try:
+            for target, text in updated.items():
+                if text != originals[target]:
+                    atomic_write_text(target, text)
+                    written.append(target)
+        except OSError as e:
+            # put back every file already replaced so the batch stays all or nothing
+            for target in written:
+                atomic_write_text(target, originals[target])
+            raise HTTPException(status_code=500, detail=f"Batch rolled back: {e}")
+
+    return {
+        "success": True,
+        "dry_run": request.dry_run,
+        "files": files
+    }
+
+def file_digest(path: Path) -> str:
+    """sha256 of a file, reused while its size and mtime are unchanged"""
+    stat = path.stat()
+    key = str(path)
+    cached = file_digest_cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+    digest = hashlib.sha256(path.read_bytes()).hexdigest()
+    file_digest_cache[key] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+def run_fingerprint(folder: str, playbook: str, inventory: str, run_vars: Dict[str, Any]) -> str:
+    """Fingerprint a run from the folder tree (playbooks, roles, inventory,
+    vars, ansible.cfg), the request and the ansible environment"""
+    folder_path = ANSIBLE_BASE / folder
+    h = hashlib.sha256()
+    h.update(json.dumps({
+        "folder": folder,
+        "playbook": playbook,
+        "inventory": inventory,
+        "vars": run_vars,
+        "env": {k: v for k, v in os.environ.items() if k.startswith("ANSIBLE_")}
+    }, sort_keys=True, default=str).encode())
+
+    for path in sorted(folder_path.rglob("*")):
+        relative = path.relative_to(folder_path)
+        if path.is_file() and not any(part.startswith('.') for part in relative.parts):
+            h.update(f"{relative}\0{file_digest(path)}\0".encode())
+
+    return h.hexdigest()
+
+def cached_run(fingerprint: str) -> Optional[Dict[str, Any]]:
+    entry = run_cache.get(fingerprint)
+    if entry and time.time() - entry["cached_at"] <= RUN_CACHE_TTL:
+        return entry
+    return None
+
+def parse_recap(output: str) -> Dict[str, int]:
+    """Sum the PLAY RECAP counters over all hosts"""
+    totals = {"ok": 0, "changed": 0, "unreachable": 0, "failed": 0}
+    recap = ANSI_ESCAPE.sub("", output).rpartition("PLAY RECAP")[2]
+    for key in totals:
+        totals[key] = sum(int(n) for n in re.findall(rf"\b{key}=(\d+)", recap))
+    return totals
+
+async def exec_ansible_playbook(folder_path: Path, playbook_path: Path, inventory_path: Path,
+                                *extra_args: str, job_id: Optional[str] = None):
+    """Run ansible-playbook and return (return_code, output), streaming the
+    output into the job as it arrives"""
+    # Run with ANSI colors enabled
+    env = os.environ.copy()
+    env['ANSIBLE_FORCE_COLOR'] = 'true'
+    ssh_pool_env(env, folder_path)
+
+    if job_id:
+        # progress only looks at the current phase (check run or real run)
+        jobs_store[job_id]["phase_started"] = time.time()
+        jobs_store[job_id]["phase_offset"] = len(jobs_store[job_id]["output"])
+
+    process = await asyncio.create_subprocess_exec(
+        "ansible-playbook",
+        "-i", str(inventory_path),
+        str(playbook_path),
+        *extra_args,
+        cwd=str(folder_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env=env
+    )
+
+    chunks = []
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    while True:
+        chunk = await process.stdout.read(65536)
+        text = decoder.decode(chunk, final=not chunk)
+        chunks.append(text)
+        if job_id:
+            jobs_store[job_id]["output"] += text
+        if not chunk:
+            break
+
+    await process.wait()
+    return process.returncode, "".join(chunks)
+
+async def run_ansible_playbook(job_id: str, folder: str, playbook: str, inventory: str,
+                               fingerprint: Optional[str] = None, check_first: bool = False):
+    """Run ansible playbook in background with detailed output.
+
+    With check_first the playbook runs in --check mode and only escalates
+    to a real run when the check reports drift.
+    """
     folder_path = ANSIBLE_BASE / folder
     playbook_path = folder_path / playbook
     inventory_path = folder_path / inventory
 
     jobs_store[job_id]["status"] = "running"
+    jobs_store[job_id]["run_started"] = time.time()
     start_time = time.time()
 
     try:
-        # Run with ANSI colors enabled
-        env = os.environ.copy()
-        env['ANSIBLE_FORCE_COLOR'] = 'true'
-
-        process = await asyncio.create_subprocess_exec(
-            "ansible-playbook",
-            "-i", str(inventory_path),
-            str(playbook_path),
-            cwd=str(folder_path),
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.STDOUT,
-            env=env
-        )
-
-        output, _ = await process.communicate()
+        jobs_store[job_id]["ssh_pool"] = await ssh_pool_lookup(inventory_path)
+
+        output = ""
+        if check_first:
+            return_code, output = await exec_ansible_playbook(
+                folder_path, playbook_path, inventory_path, "--check", "--diff", job_id=job_id
+            )
+            recap = parse_recap(output)
+            drift = return_code != 0 or recap["changed"] or recap["failed"] or recap["unreachable"]
+            jobs_store[job_id]["cache"] = "escalated" if drift else "check_clean"
+
+        if not check_first or jobs_store[job_id]["cache"] == "escalated":
+            return_code, run_output = await exec_ansible_playbook(
+                folder_path, playbook_path, inventory_path, job_id=job_id
+            )
+            output += run_output
         duration = time.time() - start_time
 
-        jobs_store[job_id]["output"] = output.decode()
-        jobs_store[job_id]["status"] = "completed" if process.returncode == 0 else "failed"
+        jobs_store[job_id]["output"] = output
+        jobs_store[job_id]["status"] = "completed" if return_code == 0 else "failed"
         jobs_store[job_id]["completed_at"] = datetime.now().isoformat()
-        jobs_store[job_id]["return_code"] = process.returncode
+        jobs_store[job_id]["return_code"] = return_code
         jobs_store[job_id]["duration"] = round(duration, 2)
 
+        if fingerprint and return_code == 0 and jobs_store[job_id]["cache"] == "check_clean" and fingerprint in run_cache:
+            # still converged: keep the real run's job id and output, only extend the TTL
+            run_cache[fingerprint]["cached_at"] = time.time()
+            save_run_cache()
+        elif fingerprint and return_code == 0:
+            run_cache[fingerprint] = {
+                "job_id": job_id,
+                "folder": folder,
+                "playbook": playbook,
+                "cached_at": time.time(),
+                "duration": jobs_store[job_id]["duration"],
+                "output": output[-RUN_CACHE_OUTPUT:]
+            }
+            save_run_cache()
+
         # Save to history
         history_entry = {
             "job_id": job_id,
@@ -265,12 +1012,20 @@ async def run_ansible_playbook(job_id: str, folder: str, playbook: str, inventor
             "started_at": jobs_store[job_id]["started_at"],
             "completed_at": jobs_store[job_id]["completed_at"],
             "duration": jobs_store[job_id]["duration"],
-            "return_code": process.returncode,
-            "output_preview": output.decode()[:500]  # Store first 500 chars
+            "return_code": return_code,
+            "cache": jobs_store[job_id]["cache"],
+            "hosts": jobs_store[job_id]["hosts"],
+            "tasks": len(TASK_LINE.findall(ANSI_ESCAPE.sub("", output))),
+            "output_preview": output[:500]  # Store first 500 chars
         }
         history_store.append(history_entry)
         save_history()
 
+        # check-mode runs do not tell how long a plain run takes
+        if return_code == 0 and jobs_store[job_id]["cache"] in ("off", "miss"):
+            record_duration(folder, playbook, history_entry["hosts"], history_entry["duration"], history_entry["tasks"])
+            save_duration_model()
+
     except Exception as e:
         duration = time.time() - start_time
         jobs_store[job_id]["status"] = "error"
@@ -280,8 +1035,12 @@ async def run_ansible_playbook(job_id: str, folder: str, playbook: str, inventor
 
 @app.post("/api/run")
 async def run_playbook(request: PlaybookRequest, background_tasks: BackgroundTasks):
-    """Run ansible playbook"""
+    """Run ansible playbook, reusing a recent identical successful run if asked"""
+    if request.cache not in ("off", "reuse", "check"):
+        raise HTTPException(status_code=400, detail="cache must be one of: off, reuse, check")
+
     job_id = str(uuid.uuid4())
+    inventory_file = ANSIBLE_BASE / request.folder / request.inventory
 
     jobs_store[job_id] = {
         "job_id": job_id,
@@ -292,38 +1051,411 @@ async def run_playbook(request: PlaybookRequest, background_tasks: BackgroundTas
         "folder": request.folder,
         "playbook": request.playbook,
         "duration": None,
-        "return_code": None
+        "return_code": None,
+        "ssh_pool": None,
+        "cache": "off",
+        "hosts": len(parse_inventory_hosts(inventory_file)) if inventory_file.is_file() else 0
     }
 
     # Update vars if provided
     if request.vars:
         folder_path = ANSIBLE_BASE / request.folder
         vars_file = folder_path / "vars.yml"
-        with open(vars_file, 'w') as f:
-            yaml.dump(request.vars, f, default_flow_style=False)
+        atomic_write_text(vars_file, yaml.dump(request.vars, default_flow_style=False))
+
+    # every run is fingerprinted so its success is recorded; cache only
+    # decides whether an existing entry is used
+    fingerprint = run_fingerprint(request.folder, request.playbook, request.inventory, request.vars)
+    check_first = False
+    if request.cache != "off":
+        cached = cached_run(fingerprint)
+        jobs_store[job_id]["cache"] = "miss"
+
+        if cached and request.cache == "reuse":
+            jobs_store[job_id].update({
+                "status": "completed",
+                "output": cached["output"],
+                "completed_at": datetime.now().isoformat(),
+                "return_code": 0,
+                "duration": 0.0,
+                "cache": "hit",
+                "cached_job_id": cached["job_id"]
+            })
+            return {"job_id": job_id, "cache": "hit", "cached_job_id": cached["job_id"]}
+
+        if cached:
+            check_first = True
+            jobs_store[job_id]["cache"] = "check"
 
     background_tasks.add_task(
+        dispatch_job,
         run_ansible_playbook,
         job_id,
         request.folder,
         request.playbook,
-        request.inventory
+        request.inventory,
+        fingerprint,
+        check_first
     )
 
+    return {"job_id": job_id, "cache": jobs_store[job_id]["cache"]}
+
+def terraform_module_path(module: str) -> Path:
+    module_path = (TERRAFORM_BASE / module).resolve()
+    if TERRAFORM_BASE.resolve() not in module_path.parents or not any(module_path.glob("*.tf")):
+        raise HTTPException(status_code=404, detail=f"Terraform module not found: {module}")
+    return module_path
+
+def terraform_config_hash(module_path: Path, tf_vars: Dict[str, Any]) -> str:
+    """Hash of the module's .tf/.tfvars files and extra vars.
+
+    The lock file is left out as the first init writes it.
+    """
+    h = hashlib.sha256(json.dumps(tf_vars, sort_keys=True, default=str).encode())
+    for path in sorted(module_path.iterdir()):
+        if path.is_file() and (path.suffix in (".tf", ".tfvars") or path.name == "terraform.tfvars.json"):
+            h.update(f"{path.name}\0{file_digest(path)}\0".encode())
+    return h.hexdigest()
+
+def terraform_plan_file(module: str, config_hash: str) -> Path:
+    return TF_PLAN_DIR / f"{module.replace('/', '__')}-{config_hash[:16]}.tfplan"
+
+async def exec_terraform(module_path: Path, *args: str):
+    """Run a terraform command in a module and return (return_code, output)"""
+    TF_PLUGIN_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    env = os.environ.copy()
+    env["TF_PLUGIN_CACHE_DIR"] = str(TF_PLUGIN_CACHE_DIR)
+    env["TF_IN_AUTOMATION"] = "true"
+    env["TF_INPUT"] = "false"
+
+    process = await asyncio.create_subprocess_exec(
+        "terraform", *args,
+        cwd=str(module_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        env=env
+    )
+
+    output, _ = await process.communicate()
+    return process.returncode, output.decode()
+
+async def plan_terraform_module(module: str, tf_vars: Dict[str, Any]) -> Dict[str, Any]:
+    """init + plan one module, reusing the stored plan when the config is unchanged"""
+    module_path = terraform_module_path(module)
+    config_hash = terraform_config_hash(module_path, tf_vars)
+    plan_file = terraform_plan_file(module, config_hash)
+    meta_file = plan_file.with_suffix(".json")
+
+    if plan_file.exists() and meta_file.exists():
+        meta = json.loads(meta_file.read_text())
+        return {**meta, "status": "completed", "cached": True}
+
+    TF_PLAN_DIR.mkdir(parents=True, exist_ok=True)
+    var_args = []
+    if tf_vars:
+        var_file = plan_file.with_suffix(".tfvars.json")
+        var_file.write_text(json.dumps(tf_vars))
+        var_args = [f"-var-file={var_file}"]
+
+    async with tf_init_lock:
+        return_code, output = await exec_terraform(module_path, "init", "-input=false", "-no-color")
+    if return_code != 0:
+        return {"module": module, "status": "failed", "cached": False, "return_code": return_code, "output": output}
+
+    tmp_plan = plan_file.with_suffix(".tmp")
+    return_code, plan_output = await exec_terraform(
+        module_path, "plan", "-input=false", "-no-color", "-detailed-exitcode", f"-out={tmp_plan}", *var_args
+    )
+    output += plan_output
+    # -detailed-exitcode: 0 = no changes, 2 = changes present, 1 = error
+    if return_code not in (0, 2):
+        tmp_plan.unlink(missing_ok=True)
+        return {"module": module, "status": "failed", "cached": False, "return_code": return_code, "output": output}
+
+    meta = {
+        "module": module,
+        "config_hash": config_hash,
+        "plan_file": str(plan_file),
+        "has_changes": return_code == 2,
+        "planned_at": datetime.now().isoformat(),
+        "return_code": 0,
+        "output": output
+    }
+    # drop plans of older configurations of this module, matching the exact
+    # <module>-<hash> stem so GCP/vpc does not touch GCP/vpc-network
+    stored = re.compile(rf"^{re.escape(module.replace('/', '__'))}-[0-9a-f]{{16}}\.")
+    for old in TF_PLAN_DIR.iterdir():
+        if stored.match(old.name) and old.stem.split('.')[0] != plan_file.stem and old != tmp_plan:
+            old.unlink(missing_ok=True)
+    os.replace(tmp_plan, plan_file)
+    meta_file.write_text(json.dumps(meta))
+    return {**meta, "status": "completed", "cached": False}
+
+async def run_terraform_job(job_id: str, action: str, modules: List[str], tf_vars: Dict[str, Dict[str, Any]]):
+    """Plan modules in parallel, or apply the stored plan of one module"""
+    jobs_store[job_id]["status"] = "running"
+    jobs_store[job_id]["run_started"] = time.time()
+    start_time = time.time()
+    semaphore = asyncio.Semaphore(TF_PARALLELISM)
+
+    async def plan(module):
+        async with semaphore:
+            try:
+                result = await plan_terraform_module(module, tf_vars.get(module, {}))
+            except Exception as e:
+                result = {"module": module, "status": "error", "output": str(e)}
+            jobs_store[job_id]["modules"][module] = result
+            return result
+
+    try:
+        if action == "plan":
+            results = await asyncio.gather(*(plan(module) for module in modules))
+        else:
+            module = modules[0]
+            module_path = terraform_module_path(module)
+            plan_file = terraform_plan_file(module, terraform_config_hash(module_path, tf_vars.get(module, {})))
+            if not plan_file.exists():
+                raise RuntimeError(f"No stored plan for {module} with the current configuration, run plan first")
+            return_code, output = await exec_terraform(module_path, "apply", "-input=false", "-no-color", str(plan_file))
+            # a saved plan can only be applied once
+            plan_file.unlink(missing_ok=True)
+            plan_file.with_suffix(".json").unlink(missing_ok=True)
+            plan_file.with_suffix(".tfvars.json").unlink(missing_ok=True)
+            result = {
+                "module": module,
+                "status": "completed" if return_code == 0 else "failed",
+                "return_code": return_code,
+                "output": output
+            }
+            jobs_store[job_id]["modules"][module] = result
+            results = [result]
+
+        duration = time.time() - start_time
+        failed = [r for r in results if r["status"] != "completed"]
+        output = "\n".join(f"### {r['module']}\n{r.get('output', '')}" for r in results)
+
+        jobs_store[job_id]["output"] = output
+        jobs_store[job_id]["status"] = "failed" if failed else "completed"
+        jobs_store[job_id]["completed_at"] = datetime.now().isoformat()
+        jobs_store[job_id]["return_code"] = 1 if failed else 0
+        jobs_store[job_id]["duration"] = round(duration, 2)
+
+        # Save to history
+        history_entry = {
+            "job_id": job_id,
+            "folder": jobs_store[job_id]["folder"],
+            "playbook": jobs_store[job_id]["playbook"],
+            "status": jobs_store[job_id]["status"],
+            "started_at": jobs_store[job_id]["started_at"],
+            "completed_at": jobs_store[job_id]["completed_at"],
+            "duration": jobs_store[job_id]["duration"],
+            "return_code": jobs_store[job_id]["return_code"],
+            "hosts": 0,
+            "output_preview": output[:500]  # Store first 500 chars
+        }
+        history_store.append(history_entry)
+        save_history()
+
+        # plans served from the store take no time and say nothing about a real plan
+        if not failed and not all(r.get("cached") for r in results):
+            record_duration(history_entry["folder"], history_entry["playbook"], 0, history_entry["duration"], 0)
+            save_duration_model()
+
+    except Exception as e:
+        duration = time.time() - start_time
+        jobs_store[job_id]["status"] = "error"
+        jobs_store[job_id]["output"] = str(e)
+        jobs_store[job_id]["completed_at"] = datetime.now().isoformat()
+        jobs_store[job_id]["duration"] = round(duration, 2)
+
+def new_terraform_job(modules: List[str], action: str) -> str:
+    job_id = str(uuid.uuid4())
+    jobs_store[job_id] = {
+        "job_id": job_id,
+        "status": "queued",
+        "output": "",
+        "started_at": datetime.now().isoformat(),
+        "completed_at": None,
+        "folder": ", ".join(modules),
+        "playbook": f"terraform {action}",
+        "duration": None,
+        "return_code": None,
+        "modules": {},
+        "hosts": 0
+    }
+    return job_id
+
+@app.get("/api/terraform/modules", response_model=List[TerraformModule])
+async def get_terraform_modules():
+    """Get all Terraform modules (directories containing .tf files)"""
+    modules = []
+
+    if not TERRAFORM_BASE.exists():
+        return modules
+
+    for module_path in sorted({tf.parent for tf in TERRAFORM_BASE.rglob("*.tf")}):
+        relative = module_path.relative_to(TERRAFORM_BASE)
+        if any(part.startswith('.') for part in relative.parts):
+            continue
+        modules.append(TerraformModule(
+            name=str(relative),
+            path=str(module_path),
+            has_tfvars=any(module_path.glob("*.tfvars")),
+            tf_files=sorted(tf.name for tf in module_path.glob("*.tf"))
+        ))
+
+    return modules
+
+@app.post("/api/terraform/plan")
+async def plan_terraform(request: TerraformPlanRequest, background_tasks: BackgroundTasks):
+    """Plan Terraform modules in parallel, reusing stored plans"""
+    # the same module twice would run two plans fighting over one state lock
+    modules = list(dict.fromkeys(request.modules))
+    if not modules:
+        raise HTTPException(status_code=400, detail="No modules given")
+    for module in modules:
+        terraform_module_path(module)
+
+    job_id = new_terraform_job(modules, "plan")
+    background_tasks.add_task(dispatch_job, run_terraform_job, job_id, "plan", modules, request.vars)
     return {"job_id": job_id}
 
+@app.post("/api/terraform/apply")
+async def apply_terraform(request: TerraformApplyRequest, background_tasks: BackgroundTasks):
+    """Apply the exact stored plan of a module"""
+    module_path = terraform_module_path(request.module)
+    if not terraform_plan_file(request.module, terraform_config_hash(module_path, request.vars)).exists():
+        raise HTTPException(status_code=409, detail="No stored plan for the current configuration, run plan first")
+
+    job_id = new_terraform_job([request.module], "apply")
+    background_tasks.add_task(dispatch_job, run_terraform_job, job_id, "apply", [request.module], {request.module: request.vars})
+    return {"job_id": job_id}
+
+def dispatch_next():
+    """Hand free slots to queued jobs"""
+    global running_jobs
+    while running_jobs < MAX_CONCURRENT_JOBS and pending_jobs:
+        now = time.time()
+        starving = [p for p in pending_jobs if now - p["queued_at"] >= JOB_MAX_WAIT]
+        if JOB_SCHEDULING == "fifo" or starving:
+            entry = min(starving or pending_jobs, key=lambda p: p["seq"])
+        else:
+            entry = min(pending_jobs, key=lambda p: (p["expected"], p["seq"]))
+        pending_jobs.remove(entry)
+        running_jobs += 1
+        entry["slot"].set_result(None)
+
+async def dispatch_job(runner, job_id: str, *args):
+    """Queue a job and run it once the dispatcher gives it a slot"""
+    global running_jobs, dispatch_seq
+    dispatch_seq += 1
+    entry = {
+        "job_id": job_id,
+        # a job without history gets a typical duration, not 0, so it does
+        # not jump ahead of every known short run
+        "expected": expected_seconds(jobs_store[job_id]),
+        "seq": dispatch_seq,
+        "queued_at": time.time(),
+        "slot": asyncio.get_running_loop().create_future()
+    }
+    pending_jobs.append(entry)
+    dispatch_next()
+
+    try:
+        await entry["slot"]
+        await runner(job_id, *args)
+    finally:
+        if entry in pending_jobs:
+            pending_jobs.remove(entry)
+        else:
+            running_jobs -= 1
+        dispatch_next()
+
+def remaining_seconds(job: Dict[str, Any], estimate: Optional[Dict[str, Any]]):
+    """(fraction done, expected seconds left) of a running job"""
+    started = job.get("phase_started") or job.get("run_started")
+    if not estimate or not started:
+        return None, None
+
+    elapsed = time.time() - started
+    tasks_seen = len(TASK_LINE.findall(ANSI_ESCAPE.sub("", job["output"][job.get("phase_offset", 0):])))
+    if estimate["tasks"] and tasks_seen:
+        # tasks done so far are a better clock than elapsed time
+        fraction = min(tasks_seen / estimate["tasks"], 0.99)
+        remaining = elapsed / fraction - elapsed
+    else:
+        fraction = min(elapsed / estimate["p50"], 0.99) if estimate["p50"] else 0
+        remaining = max(estimate["p50"] - elapsed, 0)
+    return fraction, remaining
+
+def queue_order() -> List[Dict[str, Any]]:
+    """Queued jobs in the order the dispatcher would start them (ignoring starvation)"""
+    return sorted(pending_jobs, key=lambda p: (p["expected"], p["seq"]) if JOB_SCHEDULING == "sejf" else p["seq"])
+
+def queue_wait_seconds(job_id: str) -> float:
+    """Expected wait before a queued job starts: the work left in running
+    jobs plus the queued jobs ahead of it, spread over the job slots"""
+    order = queue_order()
+    ahead = order[:[p["job_id"] for p in order].index(job_id)]
+
+    work = 0.0
+    for job in jobs_store.values():
+        if job["status"] == "running":
+            _, remaining = remaining_seconds(job, estimate_duration(job["folder"], job["playbook"], job.get("hosts", 0)))
+            if remaining is None:
+                # no history for this job: assume a typical run
+                started = job.get("phase_started") or job.get("run_started") or time.time()
+                remaining = max(neutral_duration() - (time.time() - started), 0)
+            work += remaining
+    work += sum(p["expected"] for p in ahead)
+    return work / MAX_CONCURRENT_JOBS
+
+def job_progress(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Expected duration, ETA and percent complete of a job"""
+    estimate = estimate_duration(job["folder"], job["playbook"], job.get("hosts", 0))
+    progress = {
+        "expected_duration": estimate["p50"] if estimate else None,
+        "estimate_basis": estimate["basis"] if estimate else None,
+        "eta_seconds": None,
+        "percent_complete": None,
+        "queue_position": None
+    }
+
+    if job["status"] in ("completed", "failed", "error"):
+        progress.update(eta_seconds=0, percent_complete=100.0)
+    elif job["status"] == "queued":
+        position = [p["job_id"] for p in queue_order()]
+        if job["job_id"] in position:
+            progress["queue_position"] = position.index(job["job_id"]) + 1
+            if estimate:
+                progress["eta_seconds"] = round(queue_wait_seconds(job["job_id"]) + estimate["p50"], 1)
+    else:
+        fraction, remaining = remaining_seconds(job, estimate)
+        if fraction is not None:
+            progress.update(eta_seconds=round(remaining, 1), percent_complete=round(fraction * 100, 1))
+
+    return progress
+
 @app.get("/api/jobs/{job_id}", response_model=JobStatus)
 async def get_job_status(job_id: str):
-    """Get job status"""
+    """Get job status with ETA and progress"""
     if job_id not in jobs_store:
         raise HTTPException(status_code=404, detail="Job not found")
 
-    return jobs_store[job_id]
+    return {**jobs_store[job_id], **job_progress(jobs_store[job_id])}
 
 @app.get("/api/jobs")
 async def get_all_jobs():
     """Get all active jobs"""
-    return list(jobs_store.values())
+    return [{**job, **job_progress(job)} for job in jobs_store.values()]
+
+@app.get("/api/durations")
+async def get_durations(folder: str, playbook: str, hosts: int = 0):
+    """Get the expected duration of a run from history"""
+    estimate = estimate_duration(folder, playbook, hosts)
+    if not estimate:
+        raise HTTPException(status_code=404, detail="No history for this run")
+    return estimate
 
 @app.get("/api/history")
 async def get_history(limit: int = 50):
@@ -400,6 +1532,88 @@ async def clear_history():
     save_history()
     return {"success": True, "message": "History cleared"}
 
+@app.get("/api/run-cache")
+async def get_run_cache():
+    """List cached successful runs that are still within the TTL"""
+    now = time.time()
+    return {
+        "ttl": RUN_CACHE_TTL,
+        "entries": [
+            {
+                "fingerprint": fingerprint,
+                "job_id": entry["job_id"],
+                "folder": entry["folder"],
+                "playbook": entry["playbook"],
+                "duration": entry["duration"],
+                "age_seconds": round(now - entry["cached_at"])
+            }
+            for fingerprint, entry in run_cache.items()
+            if now - entry["cached_at"] <= RUN_CACHE_TTL
+        ]
+    }
+
+@app.delete("/api/run-cache")
+async def clear_run_cache():
+    """Forget all cached run results"""
+    run_cache.clear()
+    save_run_cache()
+    return {"success": True, "message": "Run cache cleared"}
+
+@app.get("/api/ssh-pool")
+async def get_ssh_pool():
+    """Get SSH connection pool statistics and open masters"""
+    masters = []
+    if SSH_CONTROL_DIR.exists():
+        for socket in sorted(SSH_CONTROL_DIR.iterdir()):
+            match = re.match(r"^(?P<user>[^@]+)@(?P<host>.+):(?P<port>\d+)$", socket.name)
+            if not match:
+                continue
+            if await ssh_control("check", socket):
+                masters.append({**match.groupdict(), "age_seconds": round(time.time() - socket.stat().st_mtime)})
+            else:
+                socket.unlink(missing_ok=True)  # stale socket left by a killed master
+
+    lookups = ssh_pool_stats["hits"] + ssh_pool_stats["misses"]
+    return {
+        **ssh_pool_stats,
+        "hit_rate": round((ssh_pool_stats["hits"] / lookups * 100) if lookups > 0 else 0, 1),
+        "open_masters": len(masters),
+        "masters": masters,
+        "control_dir": str(SSH_CONTROL_DIR),
+        "control_persist": SSH_CONTROL_PERSIST
+    }
+
+@app.post("/api/ssh-pool/prewarm")
+async def prewarm_ssh_pool(request: PrewarmRequest):
+    """Open master connections for every host of an inventory ahead of a run"""
+    folder_path = ANSIBLE_BASE / request.folder
+    inventory_file = folder_path / request.inventory
+    if not inventory_file.exists():
+        raise HTTPException(status_code=404, detail="Inventory file not found")
+
+    targets = parse_inventory_hosts(inventory_file)
+    results = await asyncio.gather(*(prewarm_ssh_master(t, folder_path) for t in targets))
+    return {
+        "success": all(r["status"] != "failed" for r in results),
+        "hosts": results
+    }
+
+@app.delete("/api/ssh-pool")
+async def close_ssh_pool():
+    """Close all open master connections"""
+    closed = 0
+    failed = 0
+    if SSH_CONTROL_DIR.exists():
+        for socket in SSH_CONTROL_DIR.iterdir():
+            if await ssh_control("exit", socket):
+                closed += 1
+            elif await ssh_control("check", socket):
+                # still alive: keep the socket so the master stays reachable
+                failed += 1
+                continue
+            socket.unlink(missing_ok=True)
+    return {"success": failed == 0, "closed": closed, "failed": failed}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def fake_bin(tmp_path, monkeypatch):
+    """Install shell scripts as executables ahead of the real ones on PATH"""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    monkeypatch.setenv("PATH", f"{bin_dir}:{os.environ['PATH']}")
+
+    def install(name, script):
+        (bin_dir / name).write_text(script)
+        (bin_dir / name).chmod(0o755)
+        return bin_dir / name
+
+    return install
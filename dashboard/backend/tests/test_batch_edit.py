@@ -0,0 +1,169 @@
+import os
+import stat
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+
+def edit(op, **kwargs):
+    return app.BatchEdit(folder="demo", op=op, **kwargs)
+
+
+def test_add_host_to_group_with_header_and_blank_line():
+    text = "[web]\n\n[db]\ndb1\n"
+    result = app.edit_inventory_text(text, edit("add_host", group="web", name="w1"))
+    assert result == "[web]\nw1\n\n[db]\ndb1\n"
+
+
+def test_add_host_to_group_with_header_on_last_line():
+    text = "[db]\ndb1\n[web]\n"
+    result = app.edit_inventory_text(text, edit("add_host", group="web", name="w1"))
+    assert result == "[db]\ndb1\n[web]\nw1\n"
+
+
+def test_add_host_appends_after_last_member():
+    text = "[web]\nw1 ansible_host=10.0.0.1\n\n[web:vars]\nport=80\n"
+    result = app.edit_inventory_text(
+        text, edit("add_host", group="web", name="w2", host_vars={"ansible_host": "10.0.0.2"})
+    )
+    assert result == "[web]\nw1 ansible_host=10.0.0.1\nw2 ansible_host=10.0.0.2\n\n[web:vars]\nport=80\n"
+
+
+def test_add_host_creates_missing_group():
+    result = app.edit_inventory_text("[db]\ndb1\n", edit("add_host", group="web", name="w1"))
+    assert result == "[db]\ndb1\n\n[web]\nw1\n"
+
+
+def test_add_host_replaces_existing_line():
+    text = "[web]\nw1 ansible_host=10.0.0.1\n"
+    result = app.edit_inventory_text(
+        text, edit("add_host", group="web", name="w1", host_vars={"ansible_host": "10.0.0.9"})
+    )
+    assert result == "[web]\nw1 ansible_host=10.0.0.9\n"
+
+
+def test_set_host_var_in_place_keeps_comment():
+    text = "[web]\nw1 ansible_host=10.0.0.1 ansible_user=root # primary\n"
+    result = app.edit_inventory_text(
+        text, edit("set_host_var", name="w1", key="ansible_host", value="10.0.0.9")
+    )
+    assert result == "[web]\nw1 ansible_host=10.0.0.9 ansible_user=root # primary\n"
+
+
+def test_set_host_var_none_removes_var():
+    text = "[web]\nw1 ansible_host=10.0.0.1 ansible_user=root\n"
+    result = app.edit_inventory_text(text, edit("set_host_var", name="w1", key="ansible_host"))
+    assert result == "[web]\nw1 ansible_user=root\n"
+
+
+@pytest.mark.parametrize("value", ["-o ProxyJump=bastion", "a#b", "'quoted'", "a;b"])
+def test_unquotable_values_are_rejected(value):
+    text = "[web]\nw1\n"
+    with pytest.raises(ValueError):
+        app.edit_inventory_text(text, edit("set_host_var", name="w1", key="ansible_ssh_common_args", value=value))
+    with pytest.raises(ValueError):
+        app.edit_inventory_text(text, edit("add_host", group="web", name="w2", host_vars={"k": value}))
+
+
+def test_split_host_line_keeps_quoted_values():
+    tokens, comment = app.split_host_line("w1 args='-o ProxyJump=b # not a comment' k=1 # real")
+    assert tokens == ["w1", "args='-o ProxyJump=b # not a comment'", "k=1"]
+    assert comment == "# real"
+
+
+def test_set_host_var_replaces_quoted_multi_word_var():
+    text = "[web]\nw1 ansible_ssh_common_args='-o ProxyJump=b' ansible_host=1.1.1.1\n"
+    result = app.edit_inventory_text(text, edit("set_host_var", name="w1", key="ansible_ssh_common_args", value="x"))
+    assert result == "[web]\nw1 ansible_ssh_common_args=x ansible_host=1.1.1.1\n"
+
+
+def test_edits_keep_quoted_vars_on_other_keys():
+    text = "[web]\nw1 ansible_ssh_common_args=\"-o ProxyJump=b #2\" ansible_host=1.1.1.1 # primary\n"
+    result = app.edit_inventory_text(text, edit("set_host_var", name="w1", key="ansible_host", value="2.2.2.2"))
+    assert result == "[web]\nw1 ansible_ssh_common_args=\"-o ProxyJump=b #2\" ansible_host=2.2.2.2 # primary\n"
+    result = app.edit_inventory_text(result, edit("rename_host", name="w1", new_name="web1"))
+    assert result == "[web]\nweb1 ansible_ssh_common_args=\"-o ProxyJump=b #2\" ansible_host=2.2.2.2 # primary\n"
+
+
+def test_unbalanced_quote_on_edited_line_is_rejected():
+    with pytest.raises(ValueError):
+        app.edit_inventory_text("[web]\nw1 k='open\n", edit("set_host_var", name="w1", key="k", value="x"))
+
+
+def test_rename_host_ignores_group():
+    text = "[web]\nw1\n\n[all_servers]\nw1\n"
+    result = app.edit_inventory_text(text, edit("rename_host", group="web", name="w1", new_name="web1"))
+    assert result == "[web]\nweb1\n\n[all_servers]\nweb1\n"
+
+
+def test_rename_host_to_existing_name_fails():
+    with pytest.raises(ValueError):
+        app.edit_inventory_text("[web]\nw1\nw2\n", edit("rename_host", name="w1", new_name="w2"))
+
+
+def test_remove_host_scoped_to_group():
+    text = "[web]\nw1\n\n[db]\nw1\n"
+    result = app.edit_inventory_text(text, edit("remove_host", group="db", name="w1"))
+    assert result == "[web]\nw1\n\n[db]\n"
+
+
+def test_vars_and_children_sections_are_not_hosts():
+    text = "[web:vars]\nw1=1\n\n[all:children]\nw1\n"
+    with pytest.raises(ValueError):
+        app.edit_inventory_text(text, edit("remove_host", name="w1"))
+
+
+def test_set_and_unset_var_keep_comments():
+    text = "---\n# top\nport: 80   # http\nlist:\n- a\n- b\n\nname: x\n"
+    text = app.edit_vars_text(text, edit("set_var", key="list", value=["z"]))
+    text = app.edit_vars_text(text, edit("unset_var", key="port"))
+    assert text == "---\n# top\nlist:\n- z\n\nname: x\n"
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    (tmp_path / "demo").mkdir()
+    (tmp_path / "demo" / "inventory.ini").write_text("[web]\nw1\n")
+    (tmp_path / "outside").mkdir()
+    monkeypatch.setattr(app, "ANSIBLE_BASE", tmp_path)
+    return TestClient(app.app)
+
+
+def test_batch_is_all_or_nothing(client, tmp_path):
+    response = client.post("/api/batch-edit", json={"edits": [
+        {"folder": "demo", "op": "add_host", "group": "web", "name": "w2"},
+        {"folder": "demo", "op": "remove_host", "name": "missing"},
+    ]})
+    assert response.status_code == 400
+    assert (tmp_path / "demo" / "inventory.ini").read_text() == "[web]\nw1\n"
+
+
+def test_batch_dry_run_returns_diff(client, tmp_path):
+    response = client.post("/api/batch-edit", json={"dry_run": True, "edits": [
+        {"folder": "demo", "op": "add_host", "group": "web", "name": "w2"},
+    ]})
+    assert response.status_code == 200
+    assert "+w2" in response.json()["files"][0]["diff"]
+    assert (tmp_path / "demo" / "inventory.ini").read_text() == "[web]\nw1\n"
+
+
+def test_batch_rejects_folder_outside_base(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(app, "ANSIBLE_BASE", tmp_path / "demo")
+    response = client.post("/api/batch-edit", json={"edits": [
+        {"folder": "../outside", "op": "set_var", "key": "a", "value": 1},
+    ]})
+    assert response.status_code == 404
+    assert not (tmp_path / "outside" / "vars.yml").exists()
+
+
+def test_new_file_gets_umask_mode(client, tmp_path):
+    response = client.post("/api/batch-edit", json={"edits": [
+        {"folder": "demo", "op": "set_var", "key": "a", "value": 1},
+    ]})
+    assert response.status_code == 200
+    umask = os.umask(0)
+    os.umask(umask)
+    mode = stat.S_IMODE((tmp_path / "demo" / "vars.yml").stat().st_mode)
+    assert mode == 0o666 & ~umask
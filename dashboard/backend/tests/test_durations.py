@@ -0,0 +1,205 @@
+import asyncio
+import time
+
+import pytest
+
+import app
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    monkeypatch.setattr(app, "duration_model", {})
+    monkeypatch.setattr(app, "jobs_store", {})
+    monkeypatch.setattr(app, "pending_jobs", [])
+    monkeypatch.setattr(app, "running_jobs", 0)
+    monkeypatch.setattr(app, "MAX_CONCURRENT_JOBS", 1)
+    monkeypatch.setattr(app, "JOB_SCHEDULING", "sejf")
+
+
+def job(job_id, status, playbook, **extra):
+    app.jobs_store[job_id] = {
+        "job_id": job_id, "status": status, "output": "", "folder": "demo",
+        "playbook": playbook, "hosts": 1, **extra
+    }
+    return app.jobs_store[job_id]
+
+
+def queue(job_id, expected, seq):
+    app.pending_jobs.append({"job_id": job_id, "expected": expected, "seq": seq, "queued_at": time.time()})
+
+
+def test_size_bucket():
+    assert [app.size_bucket(n) for n in (0, 1, 2, 3, 5, 8)] == [1, 1, 2, 4, 8, 8]
+
+
+def test_estimate_uses_only_same_folder_and_playbook():
+    app.record_duration("other", "site.yml", 1, 50, 10)
+    app.record_duration("demo", "other.yml", 1, 51, 10)
+    assert app.estimate_duration("demo", "site.yml", 1) is None
+
+
+def test_estimate_falls_back_from_size_to_playbook():
+    for d in (10, 20, 30):
+        app.record_duration("demo", "site.yml", 2, d, 4)
+    estimate = app.estimate_duration("demo", "site.yml", 16)
+    assert estimate["p50"] == 20
+    assert estimate["tasks"] == 4
+    assert estimate["basis"] == "demo|site.yml"
+    assert app.estimate_duration("demo", "site.yml", 2)["basis"] == "demo|site.yml|2"
+
+
+def test_unknown_playbook_has_no_eta():
+    running = job("a", "running", "new.yml", run_started=time.time() - 5, output="TASK [x]\n")
+    progress = app.job_progress(running)
+    assert progress["eta_seconds"] is None
+    assert progress["percent_complete"] is None
+    assert progress["estimate_basis"] is None
+
+
+def test_queued_eta_includes_jobs_ahead():
+    for playbook, d in (("long.yml", 100), ("short.yml", 10)):
+        app.record_duration("demo", playbook, 1, d, 0)
+    job("run", "running", "long.yml", run_started=time.time() - 40)
+    job("s1", "queued", "short.yml")
+    job("l2", "queued", "long.yml")
+    job("s2", "queued", "short.yml")
+    queue("s1", 10, 1)
+    queue("l2", 100, 2)
+    queue("s2", 10, 3)
+
+    progress = app.job_progress(app.jobs_store["l2"])
+    assert progress["queue_position"] == 3
+    # 60s left in the running job + two 10s jobs ahead + its own 100s
+    assert progress["eta_seconds"] == pytest.approx(180, abs=1)
+
+
+def test_progress_counts_only_tasks_of_current_phase():
+    app.record_duration("demo", "site.yml", 1, 100, 10)
+    check_output = "TASK [a]\n" * 10 + "PLAY RECAP\n"
+    running = job(
+        "a", "running", "site.yml", output=check_output + "TASK [a]\nTASK [b]\n",
+        run_started=time.time() - 110, phase_started=time.time() - 10, phase_offset=len(check_output)
+    )
+    progress = app.job_progress(running)
+    assert progress["percent_complete"] == 20.0
+    assert progress["eta_seconds"] == pytest.approx(40, abs=1)
+
+
+def test_queued_eta_counts_unknown_jobs_as_typical():
+    app.record_duration("demo", "short.yml", 1, 10, 0)
+    app.record_duration("demo", "long.yml", 1, 30, 0)
+    job("run", "running", "new.yml", run_started=time.time() - 5)
+    job("q", "queued", "short.yml")
+    queue("q", 10, 1)
+    # 20s typical run - 5s elapsed + its own 10s
+    assert app.job_progress(app.jobs_store["q"])["eta_seconds"] == pytest.approx(25, abs=1)
+
+
+class StubRunner:
+    """Records start order; each job runs until released"""
+
+    def __init__(self):
+        self.started = []
+        self.release = {}
+
+    async def __call__(self, job_id, fail=False):
+        self.started.append(job_id)
+        self.release[job_id] = asyncio.Event()
+        await self.release[job_id].wait()
+        if fail:
+            raise RuntimeError("runner failed")
+
+
+def dispatch(runner, specs, finish_first=True):
+    """Queue jobs (job_id, playbook) behind a blocker and return start order"""
+
+    async def scenario():
+        blocker = asyncio.create_task(app.dispatch_job(runner, "blocker"))
+        await asyncio.sleep(0)
+        tasks = [asyncio.create_task(app.dispatch_job(runner, job_id)) for job_id, _ in specs]
+        await asyncio.sleep(0)
+        runner.release["blocker"].set()
+        await blocker
+        while len(runner.started) <= len(specs):
+            await asyncio.sleep(0)
+            for job_id in runner.started:
+                runner.release[job_id].set()
+        await asyncio.gather(*tasks)
+
+    job("blocker", "queued", "long.yml")
+    for job_id, playbook in specs:
+        job(job_id, "queued", playbook)
+    asyncio.run(scenario())
+    return runner.started[1:]
+
+
+@pytest.fixture
+def history():
+    app.record_duration("demo", "short.yml", 1, 10, 0)
+    app.record_duration("demo", "long.yml", 1, 100, 0)
+
+
+def test_sejf_starts_shortest_expected_job_first(history):
+    assert dispatch(StubRunner(), [("l", "long.yml"), ("s", "short.yml")]) == ["s", "l"]
+
+
+def test_fifo_starts_jobs_in_arrival_order(history, monkeypatch):
+    monkeypatch.setattr(app, "JOB_SCHEDULING", "fifo")
+    assert dispatch(StubRunner(), [("l", "long.yml"), ("s", "short.yml")]) == ["l", "s"]
+
+
+def test_unknown_job_does_not_jump_ahead_of_short_jobs(history):
+    order = dispatch(StubRunner(), [("k", "k8s.yml"), ("s1", "short.yml"), ("s2", "short.yml")])
+    assert order == ["s1", "s2", "k"]
+
+
+def test_starving_job_goes_first(history, monkeypatch):
+    monkeypatch.setattr(app, "JOB_MAX_WAIT", 0)
+    assert dispatch(StubRunner(), [("l", "long.yml"), ("s", "short.yml")]) == ["l", "s"]
+
+
+def test_concurrency_is_capped(monkeypatch):
+    monkeypatch.setattr(app, "MAX_CONCURRENT_JOBS", 2)
+    runner = StubRunner()
+
+    async def scenario():
+        tasks = [asyncio.create_task(app.dispatch_job(runner, job_id)) for job_id in "abc"]
+        await asyncio.sleep(0)
+        assert runner.started == ["a", "b"]
+        assert app.running_jobs == 2
+        assert [p["job_id"] for p in app.pending_jobs] == ["c"]
+        runner.release["a"].set()
+        await tasks[0]
+        await asyncio.sleep(0)
+        assert runner.started == ["a", "b", "c"]
+        runner.release["b"].set()
+        runner.release["c"].set()
+        await asyncio.gather(*tasks)
+
+    for job_id in "abc":
+        job(job_id, "queued", "site.yml")
+    asyncio.run(scenario())
+    assert app.running_jobs == 0
+
+
+def test_failed_runner_frees_its_slot():
+    runner = StubRunner()
+
+    async def scenario():
+        failing = asyncio.create_task(app.dispatch_job(runner, "a", True))
+        waiting = asyncio.create_task(app.dispatch_job(runner, "b"))
+        await asyncio.sleep(0)
+        assert runner.started == ["a"]
+        runner.release["a"].set()
+        with pytest.raises(RuntimeError):
+            await failing
+        await asyncio.sleep(0)
+        assert runner.started == ["a", "b"]
+        runner.release["b"].set()
+        await waiting
+
+    job("a", "queued", "site.yml")
+    job("b", "queued", "site.yml")
+    asyncio.run(scenario())
+    assert app.running_jobs == 0
+    assert app.pending_jobs == []
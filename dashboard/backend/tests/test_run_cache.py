@@ -0,0 +1,77 @@
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+FAKE_PLAYBOOK = """#!/bin/sh
+case "$*" in
+  *--check*) echo "CHECK RUN"; changed=${DRIFT:-0};;
+  *) echo "REAL RUN"; changed=2;;
+esac
+printf 'PLAY RECAP ****\\nw1 : ok=3 changed=%s unreachable=0 failed=0\\n' "$changed"
+"""
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, fake_bin):
+    (tmp_path / "demo").mkdir()
+    (tmp_path / "demo" / "site.yml").write_text("- hosts: all\n")
+    (tmp_path / "demo" / "inventory.ini").write_text("[web]\nw1 ansible_connection=local\n")
+    fake_bin("ansible-playbook", FAKE_PLAYBOOK)
+
+    monkeypatch.delenv("DRIFT", raising=False)
+    monkeypatch.setattr(app, "ANSIBLE_BASE", tmp_path)
+    monkeypatch.setattr(app, "RUN_CACHE_FILE", tmp_path / "run_cache.json")
+    monkeypatch.setattr(app, "SSH_CONTROL_DIR", tmp_path / "sockets")
+    monkeypatch.setattr(app, "run_cache", {})
+    monkeypatch.setattr(app, "save_history", lambda: None)
+    monkeypatch.setattr(app, "save_duration_model", lambda: None)
+    return TestClient(app.app)
+
+
+def run(client, cache):
+    response = client.post("/api/run", json={
+        "folder": "demo", "playbook": "site.yml", "inventory": "inventory.ini", "vars": {}, "cache": cache
+    }).json()
+    return response, client.get(f"/api/jobs/{response['job_id']}").json()
+
+
+def test_reuse_returns_cached_result(client):
+    first, _ = run(client, "reuse")
+    assert first["cache"] == "miss"
+    second, job = run(client, "reuse")
+    assert second["cache"] == "hit"
+    assert second["cached_job_id"] == first["job_id"]
+    assert "REAL RUN" in job["output"]
+
+
+def test_check_clean_keeps_real_run_output(client):
+    first, _ = run(client, "check")
+    _, job = run(client, "check")
+    assert job["cache"] == "check_clean"
+    assert "REAL RUN" not in job["output"]
+
+    reused, job = run(client, "reuse")
+    assert reused["cached_job_id"] == first["job_id"]
+    assert "REAL RUN" in job["output"]
+    assert "CHECK RUN" not in job["output"]
+
+
+def test_check_escalates_on_drift(client, monkeypatch):
+    run(client, "check")
+    monkeypatch.setenv("DRIFT", "1")
+    _, job = run(client, "check")
+    assert job["cache"] == "escalated"
+    assert "REAL RUN" in job["output"]
+
+
+def test_uncached_run_is_recorded_for_later_reuse(client):
+    first, job = run(client, "off")
+    assert first["cache"] == "off"
+    assert "REAL RUN" in job["output"]
+    second, _ = run(client, "off")
+    assert second["cache"] == "off"
+
+    reused, _ = run(client, "reuse")
+    assert reused["cache"] == "hit"
+    assert reused["cached_job_id"] == second["job_id"]
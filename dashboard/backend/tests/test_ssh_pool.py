@@ -0,0 +1,99 @@
+import asyncio
+import shlex
+
+import pytest
+
+import app
+
+FAKE_SSH = """#!/bin/sh
+echo "$@" >> "$SSH_CALLS"
+case "$*" in *"-O check"*) exit 1;; *"-O exit"*) exit 1;; esac
+"""
+
+
+@pytest.fixture
+def ssh(tmp_path, monkeypatch, fake_bin):
+    fake_bin("ssh", FAKE_SSH)
+    monkeypatch.setenv("SSH_CALLS", str(tmp_path / "calls"))
+    monkeypatch.delenv("ANSIBLE_SSH_ARGS", raising=False)
+    monkeypatch.delenv("ANSIBLE_CONFIG", raising=False)
+    monkeypatch.setattr(app, "SSH_CONTROL_DIR", tmp_path / "sockets")
+    return tmp_path
+
+
+def test_parse_inventory_hosts_reads_connection_settings(tmp_path):
+    inventory = tmp_path / "inventory.ini"
+    inventory.write_text(
+        "[all:vars]\n"
+        "ansible_ssh_common_args='-o ProxyJump=bastion'\n"
+        "[web]\n"
+        "w1 ansible_host=10.0.0.1 ansible_ssh_private_key_file=~/.ssh/web  # primary\n"
+        "w2 ansible_ssh_host=10.0.0.2 ansible_ssh_user=admin ansible_ssh_port=2222\n"
+        "w3 ansible_host=10.0.0.3 ansible_password=secret\n"
+        "local ansible_connection=local\n"
+    )
+    targets = {t["name"]: t for t in app.parse_inventory_hosts(inventory)}
+
+    assert set(targets) == {"w1", "w2", "w3"}
+    assert targets["w1"]["identity_file"] == "~/.ssh/web"
+    assert targets["w1"]["ssh_args"] == "-o ProxyJump=bastion"
+    assert (targets["w2"]["host"], targets["w2"]["user"], targets["w2"]["port"]) == ("10.0.0.2", "admin", "2222")
+    assert targets["w3"]["password_auth"] is True
+    assert "secret" not in repr(targets)
+
+
+def test_ssh_pool_env_keeps_configured_ssh_args(ssh):
+    folder = ssh / "demo"
+    folder.mkdir()
+    (folder / "ansible.cfg").write_text(
+        "[ssh_connection]\nssh_args = -o ProxyJump=bastion -o ControlPersist=60s\n"
+    )
+    args = shlex.split(app.ssh_pool_env({}, folder)["ANSIBLE_SSH_ARGS"])
+    assert args[:2] == ["-o", "ProxyJump=bastion"]
+    assert f"ControlPersist={app.SSH_CONTROL_PERSIST}s" in args
+    assert "ControlPersist=60s" not in args
+
+    env = app.ssh_pool_env({"ANSIBLE_SSH_ARGS": "-o IdentitiesOnly=yes"}, folder)
+    assert env["ANSIBLE_SSH_ARGS"].startswith("-o IdentitiesOnly=yes -o ControlMaster=auto")
+
+
+def test_prewarm_passes_key_and_common_args(ssh):
+    target = {"name": "w1", "host": "10.0.0.1", "user": "root", "port": "22",
+              "identity_file": "~/.ssh/web", "ssh_args": "-o ProxyJump=bastion", "password_auth": False}
+    result = asyncio.run(app.prewarm_ssh_master(target, ssh))
+    assert result["status"] == "opened"
+    call = (ssh / "calls").read_text().splitlines()[-1]
+    assert "-o ProxyJump=bastion" in call
+    assert "-i ~/.ssh/web" in call
+
+
+def test_prewarm_marks_password_hosts_unsupported(ssh):
+    target = {"name": "w1", "host": "10.0.0.1", "user": "root", "port": "22",
+              "identity_file": None, "ssh_args": "", "password_auth": True}
+    result = asyncio.run(app.prewarm_ssh_master(target, ssh))
+    assert result["status"] == "unsupported"
+    assert not (ssh / "calls").exists()
+
+
+def test_prewarm_reports_socket_path_too_long(ssh):
+    target = {"name": "w1", "host": "web-01." + "a" * 80 + ".example.com", "user": "root", "port": "22",
+              "identity_file": None, "ssh_args": "", "password_auth": False}
+    result = asyncio.run(app.prewarm_ssh_master(target, ssh))
+    assert result["status"] == "failed"
+    assert "SSH_CONTROL_DIR" in result["error"]
+    assert not (ssh / "calls").exists()
+
+
+def test_close_keeps_socket_of_live_master(ssh, monkeypatch):
+    sockets = ssh / "sockets"
+    sockets.mkdir()
+    (sockets / "root@live:22").touch()
+    (sockets / "root@stale:22").touch()
+
+    async def control(command, socket, timeout=5):
+        return command == "check" and socket.name == "root@live:22"
+
+    monkeypatch.setattr(app, "ssh_control", control)
+    result = asyncio.run(app.close_ssh_pool())
+    assert result == {"success": False, "closed": 0, "failed": 1}
+    assert sorted(p.name for p in sockets.iterdir()) == ["root@live:22"]
@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+import app
+
+FAKE_TERRAFORM = """#!/bin/sh
+echo "$(basename "$PWD") $1" >> "$TF_CALLS"
+if [ "$1" = plan ]; then
+  for arg; do case "$arg" in -out=*) echo plan > "${arg#-out=}";; esac; done
+  exit 2
+fi
+"""
+
+
+@pytest.fixture
+def terraform(tmp_path, monkeypatch, fake_bin):
+    base = tmp_path / "Terraform"
+    for module in ("GCP/vpc", "GCP/vpc-network"):
+        (base / module).mkdir(parents=True)
+        (base / module / "main.tf").write_text(f'# {module}\n')
+    fake_bin("terraform", FAKE_TERRAFORM)
+
+    monkeypatch.setattr(app, "TERRAFORM_BASE", base)
+    monkeypatch.setattr(app, "TF_PLAN_DIR", tmp_path / "plans")
+    monkeypatch.setattr(app, "TF_PLUGIN_CACHE_DIR", tmp_path / "plugins")
+    monkeypatch.setenv("TF_CALLS", str(tmp_path / "calls"))
+    return tmp_path
+
+
+def plan(module):
+    return asyncio.run(app.plan_terraform_module(module, {}))
+
+
+def test_unchanged_module_reuses_stored_plan(terraform):
+    assert plan("GCP/vpc")["cached"] is False
+    result = plan("GCP/vpc")
+    assert result["cached"] is True
+    assert result["has_changes"] is True
+    assert (terraform / "calls").read_text().count("vpc plan") == 1
+
+
+def test_replanning_a_module_keeps_plans_of_similarly_named_modules(terraform):
+    network_plan = plan("GCP/vpc-network")["plan_file"]
+    (terraform / "Terraform" / "GCP" / "vpc" / "main.tf").write_text("# v1\n")
+    plan("GCP/vpc")
+    (terraform / "Terraform" / "GCP" / "vpc" / "main.tf").write_text("# v2\n")
+    vpc_plan = plan("GCP/vpc")["plan_file"]
+
+    stored = sorted(p.name for p in (terraform / "plans").glob("*.tfplan"))
+    assert stored == sorted([app.Path(network_plan).name, app.Path(vpc_plan).name])
+
+
+def test_duplicate_modules_are_planned_once(terraform):
+    client = TestClient(app.app)
+    response = client.post("/api/terraform/plan", json={"modules": ["GCP/vpc", "GCP/vpc"]})
+    job = client.get(f"/api/jobs/{response.json()['job_id']}").json()
+    assert job["folder"] == "GCP/vpc"
+    assert (terraform / "calls").read_text().count("vpc plan") == 1
+
+
+def test_module_outside_base_is_rejected(terraform):
+    client = TestClient(app.app)
+    response = client.post("/api/terraform/plan", json={"modules": ["../bin"]})
+    assert response.status_code == 404
+
+
+def test_job_served_from_stored_plans_does_not_record_duration(terraform, monkeypatch):
+    monkeypatch.setattr(app, "duration_model", {})
+    monkeypatch.setattr(app, "save_duration_model", lambda: None)
+    monkeypatch.setattr(app, "save_history", lambda: None)
+
+    job_id = app.new_terraform_job(["GCP/vpc"], "plan")
+    asyncio.run(app.run_terraform_job(job_id, "plan", ["GCP/vpc"], {}))
+    assert app.estimate_duration("GCP/vpc", "terraform plan", 0)["samples"] == 1
+
+    job_id = app.new_terraform_job(["GCP/vpc"], "plan")
+    asyncio.run(app.run_terraform_job(job_id, "plan", ["GCP/vpc"], {}))
+    assert app.jobs_store[job_id]["modules"]["GCP/vpc"]["cached"] is True
+    assert app.estimate_duration("GCP/vpc", "terraform plan", 0)["samples"] == 1
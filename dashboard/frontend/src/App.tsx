@@ -71,6 +71,10 @@ interface JobStatus {
   return_code: number | null
   folder: string
   playbook: string
+  expected_duration?: number | null
+  eta_seconds?: number | null
+  percent_complete?: number | null
+  queue_position?: number | null
 }
 
 interface HistoryItem {
@@ -245,7 +249,7 @@ function Dashboard({ theme }: { theme: 'dark' | 'light' }) {
   }, [selectedFolder])
 
   useEffect(() => {
-    if (currentJob && currentJob.status === 'running') {
+    if (currentJob && (currentJob.status === 'running' || currentJob.status === 'queued')) {
       const interval = setInterval(() => {
         checkJobStatus(currentJob.job_id)
       }, 1000)
@@ -688,7 +692,7 @@ function Dashboard({ theme }: { theme: 'dark' | 'light' }) {
                     <div className="flex items-center gap-2">
                       <h2 className={`text-xl font-semibold ${styles.textAccent} flex items-center gap-2`}>
                         <Terminal className="w-6 h-6" />
-                        {currentJob.status === 'running' && <Loader2 className="w-5 h-5 animate-spin text-green-500" />}
+                        {(currentJob.status === 'running' || currentJob.status === 'queued') && <Loader2 className="w-5 h-5 animate-spin text-green-500" />}
                         {currentJob.status === 'completed' && <CheckCircle className="w-5 h-5 text-green-500" />}
                         {(currentJob.status === 'failed' || currentJob.status === 'error') && <XCircle className="w-5 h-5 text-red-500" />}
                         Execution Output
@@ -699,16 +703,27 @@ function Dashboard({ theme }: { theme: 'dark' | 'light' }) {
                           {currentJob.duration}s
                         </span>
                       )}
+                      {currentJob.status === 'queued' && currentJob.queue_position != null && (
+                        <span className={`text-sm ${styles.textSecondary}`}>
+                          #{currentJob.queue_position} in queue
+                        </span>
+                      )}
+                      {currentJob.status === 'running' && currentJob.eta_seconds != null && (
+                        <span className={`text-sm ${styles.textSecondary} flex items-center gap-1`}>
+                          <Clock className="w-4 h-4" />
+                          {currentJob.percent_complete}% · ~{Math.ceil(currentJob.eta_seconds)}s left
+                        </span>
+                      )}
                     </div>
                     <div className="flex items-center gap-2">
                       <span className={`px-3 py-1.5 rounded-full text-sm font-semibold ${
-                        currentJob.status === 'running' ? 'bg-blue-500/20 text-blue-400 border border-blue-500/30' :
+                        currentJob.status === 'running' || currentJob.status === 'queued' ? 'bg-blue-500/20 text-blue-400 border border-blue-500/30' :
                         currentJob.status === 'completed' ? 'bg-green-500/20 text-green-400 border border-green-500/30' :
                         'bg-red-500/20 text-red-400 border border-red-500/30'
                       }`}>
                         {currentJob.status.toUpperCase()}
                       </span>
-                      {currentJob.status !== 'running' && (
+                      {currentJob.status !== 'running' && currentJob.status !== 'queued' && (
                         <>
                           <button
                             onClick={copyOutput}